@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-import json
-import queue
+import math
+import struct
 import threading
 import time
 import wave
@@ -9,8 +9,66 @@ from pathlib import Path
 
 import numpy as np
 
+from .jsonl_io import INDEX_BUFFERING, IndexBatcher
 from .stats import StatsCounter
 
+# Index records have a fixed schema, so the line is %-formatted from a byte
+# template instead of building a dict and running a general JSON encoder.
+_INDEX_TEMPLATE = (
+    b'{"block_id":%d,"time":{"mono_ms":%d,"epoch_ms":%d},'
+    b'"samples":%d,"channels":%d,"overrun":%s}\n'
+)
+
+
+class _RawWavWriter:
+    """Stream PCM16 frames to a WAV file through a large write buffer.
+
+    wave.Wave_write does a Python-level write and header bookkeeping for every
+    writeframes() call (~50x/s at 20 ms blocks). Here the 44-byte RIFF/WAVE
+    header is written once with placeholder sizes, frames go straight through
+    a 1 MiB BufferedWriter, and the RIFF and data chunk sizes are patched on
+    close.
+    """
+
+    def __init__(self, path: Path, sample_rate: int, channels: int) -> None:
+        self._handle = open(path, "wb", buffering=1 << 20)
+        self._data_bytes = 0
+        byte_rate = sample_rate * channels * 2
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            0,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,  # PCM
+            channels,
+            sample_rate,
+            byte_rate,
+            channels * 2,
+            16,
+            b"data",
+            0,
+        )
+        self._handle.write(header)
+
+    def write(self, data: bytes) -> None:
+        self._handle.write(data)
+        self._data_bytes += len(data)
+
+    def close(self) -> None:
+        self._handle.seek(4)
+        self._handle.write(struct.pack("<I", 36 + self._data_bytes))
+        self._handle.seek(40)
+        self._handle.write(struct.pack("<I", self._data_bytes))
+        self._handle.close()
+
+    def __enter__(self) -> "_RawWavWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
 class AudioCapture:
     def __init__(self, config: dict, output_dir: Path, timebase, logger) -> None:
@@ -64,11 +122,6 @@ class AudioCapture:
         else:
             self.logger.error("Unsupported audio mode: %s", mode)
 
-    def _write_wave_header(self, handle: wave.Wave_write, sample_rate: int, channels: int) -> None:
-        handle.setnchannels(channels)
-        handle.setsampwidth(2)
-        handle.setframerate(sample_rate)
-
     def _run_mock(
         self,
         audio_path: Path,
@@ -79,16 +132,26 @@ class AudioCapture:
         fault_after: float,
         fault_duration: float,
     ) -> None:
-        freq = 440.0
-        phase = 0.0
-        step = 2 * np.pi * freq / sample_rate
+        freq = 440
         block_duration = block_samples / sample_rate
         next_tick = time.perf_counter()
 
+        # The tone is periodic against the fixed sample rate, so precompute one
+        # full cycle (lcm of tone period and block size) as int16 PCM bytes and
+        # replay slices of it; the hot loop then does no trig or allocation.
+        period = sample_rate // math.gcd(freq, sample_rate)
+        cycle_samples = period * block_samples // math.gcd(period, block_samples)
+        t = 2 * np.pi * freq * np.arange(cycle_samples) / sample_rate
+        signal = (0.2 * np.sin(t)).astype(np.float32)
+        cycle_i16 = (np.tile(signal[:, None], (1, channels)) * 32767).astype(np.int16)
+        pcm_cycle = cycle_i16.tobytes()
+        block_bytes = block_samples * channels * 2
+        pcm_offset = 0
+
         start_time = time.monotonic()
         fault_active = False
-        with wave.open(str(audio_path), "wb") as wav_handle, index_path.open("w", encoding="utf-8") as idx:
-            self._write_wave_header(wav_handle, sample_rate, channels)
+        with _RawWavWriter(audio_path, sample_rate, channels) as wav_handle, index_path.open("wb", buffering=INDEX_BUFFERING) as idx:
+            batcher = IndexBatcher(idx)
             block_id = 0
             while not self._stop_event.is_set():
                 elapsed = time.monotonic() - start_time
@@ -103,30 +166,23 @@ class AudioCapture:
 
                 if fault_active:
                     self.stats.add_overrun()
-                    time.sleep(0.05)
+                    self._stop_event.wait(0.05)
                     continue
 
-                times = self.timebase.now()
-                t = phase + step * np.arange(block_samples)
-                signal = (0.2 * np.sin(t)).astype(np.float32)
-                phase = t[-1] + step
-                audio = np.tile(signal[:, None], (1, channels))
-                audio_i16 = (audio * 32767).astype(np.int16)
-                wav_handle.writeframes(audio_i16.tobytes())
-
-                record = {
-                    "block_id": block_id,
-                    "time": times,
-                    "samples": block_samples,
-                    "channels": channels,
-                    "overrun": False,
-                }
-                idx.write(json.dumps(record, ensure_ascii=True) + "\n")
+                mono_ms, epoch_ms = self.timebase.now_ms()
+                wav_handle.write(pcm_cycle[pcm_offset : pcm_offset + block_bytes])
+                pcm_offset = (pcm_offset + block_bytes) % len(pcm_cycle)
+
+                batcher.append_line(
+                    _INDEX_TEMPLATE % (block_id, mono_ms, epoch_ms, block_samples, channels, b"false")
+                )
                 self.stats.increment()
                 block_id += 1
 
                 next_tick += block_duration
-                time.sleep(max(0.0, next_tick - time.perf_counter()))
+                if self._stop_event.wait(timeout=max(0.0, next_tick - time.perf_counter())):
+                    break
+            batcher.flush()
 
     def _run_wav_file(
         self,
@@ -149,9 +205,9 @@ class AudioCapture:
 
         start_time = time.monotonic()
         fault_active = False
-        with wave.open(str(input_path), "rb") as src, wave.open(str(audio_path), "wb") as dst:
-            self._write_wave_header(dst, sample_rate, channels)
-            with index_path.open("w", encoding="utf-8") as idx:
+        with wave.open(str(input_path), "rb") as src, _RawWavWriter(audio_path, sample_rate, channels) as dst:
+            with index_path.open("wb", buffering=INDEX_BUFFERING) as idx:
+                batcher = IndexBatcher(idx)
                 while not self._stop_event.is_set():
                     elapsed = time.monotonic() - start_time
                     if fault_after > 0 and fault_duration > 0 and fault_after <= elapsed < fault_after + fault_duration:
@@ -165,7 +221,7 @@ class AudioCapture:
 
                     if fault_active:
                         self.stats.add_overrun()
-                        time.sleep(0.05)
+                        self._stop_event.wait(0.05)
                         continue
 
                     data = src.readframes(block_samples)
@@ -173,21 +229,18 @@ class AudioCapture:
                         src.rewind()
                         continue
 
-                    times = self.timebase.now()
-                    dst.writeframes(data)
-                    record = {
-                        "block_id": block_id,
-                        "time": times,
-                        "samples": block_samples,
-                        "channels": channels,
-                        "overrun": False,
-                    }
-                    idx.write(json.dumps(record, ensure_ascii=True) + "\n")
+                    mono_ms, epoch_ms = self.timebase.now_ms()
+                    dst.write(data)
+                    batcher.append_line(
+                        _INDEX_TEMPLATE % (block_id, mono_ms, epoch_ms, block_samples, channels, b"false")
+                    )
                     self.stats.increment()
                     block_id += 1
 
                     next_tick += block_duration
-                    time.sleep(max(0.0, next_tick - time.perf_counter()))
+                    if self._stop_event.wait(timeout=max(0.0, next_tick - time.perf_counter())):
+                        break
+                batcher.flush()
 
     def _run_mic(
         self,
@@ -205,13 +258,28 @@ class AudioCapture:
             self.logger.error("sounddevice not available: %s", exc)
             return
 
-        q: queue.Queue = queue.Queue(maxsize=100)
+        # Single-producer/single-consumer ring of preallocated int16 slabs.
+        # The realtime callback only copies into a slab and bumps head, so it
+        # does no heap allocation and takes no queue lock; the writer owns
+        # tail. head/tail are single-writer ints, safe to read cross-thread
+        # under the GIL.
+        ring_size = 128
+        slabs = np.empty((ring_size, block_samples, channels), dtype=np.int16)
+        slab_frames = [0] * ring_size
+        slab_times: list[tuple[int, int]] = [(0, 0)] * ring_size
+        slab_overrun = [False] * ring_size
+        head = 0
+        tail = 0
+        # 回调侧 overrun 记在回调线程独占的计数里，由 writer 线程差值
+        # 折进 stats——stats 的每个计数器保持单写线程，无锁自增才安全
+        cb_overruns = 0
+        data_ready = threading.Event()
 
         start_time = time.monotonic()
         fault_active = False
 
         def callback(indata, frames, _time, status):
-            nonlocal fault_active
+            nonlocal fault_active, head, cb_overruns
             elapsed = time.monotonic() - start_time
             if fault_after > 0 and fault_duration > 0 and fault_after <= elapsed < fault_after + fault_duration:
                 if not fault_active:
@@ -222,42 +290,55 @@ class AudioCapture:
                     self.logger.info("Audio fault cleared")
                 fault_active = False
             if fault_active:
-                self.stats.add_overrun()
+                cb_overruns += 1
+                return
+            if head - tail >= ring_size:
+                cb_overruns += 1
                 return
-            overrun = bool(status)
-            times = self.timebase.now()
-            try:
-                q.put_nowait((indata.copy(), times, overrun))
-            except queue.Full:
-                self.stats.add_overrun()
+            slot = head % ring_size
+            count = min(frames, block_samples)
+            np.copyto(slabs[slot, :count], indata[:count])
+            slab_frames[slot] = count
+            slab_times[slot] = self.timebase.now_ms()
+            slab_overrun[slot] = bool(status)
+            head += 1
+            data_ready.set()
 
         writer_stop = threading.Event()
 
         def writer():
+            nonlocal tail
             block_id = 0
-            with wave.open(str(audio_path), "wb") as wav_handle, index_path.open("w", encoding="utf-8") as idx:
-                self._write_wave_header(wav_handle, sample_rate, channels)
-                while not writer_stop.is_set() or not q.empty():
-                    try:
-                        data, times, overrun = q.get(timeout=0.1)
-                    except queue.Empty:
+            folded_overruns = 0
+            with _RawWavWriter(audio_path, sample_rate, channels) as wav_handle, index_path.open("wb", buffering=INDEX_BUFFERING) as idx:
+                batcher = IndexBatcher(idx)
+                while not writer_stop.is_set() or tail != head:
+                    pending = cb_overruns - folded_overruns
+                    if pending:
+                        self.stats.add_overrun(pending)
+                        folded_overruns += pending
+                    if tail == head:
+                        data_ready.wait(timeout=0.1)
+                        data_ready.clear()
                         continue
-                    audio_i16 = data
-                    if audio_i16.dtype != np.int16:
-                        audio_i16 = (audio_i16 * 32767).astype(np.int16)
-                    wav_handle.writeframes(audio_i16.tobytes())
-                    record = {
-                        "block_id": block_id,
-                        "time": times,
-                        "samples": int(data.shape[0]),
-                        "channels": int(data.shape[1]) if data.ndim > 1 else 1,
-                        "overrun": bool(overrun),
-                    }
-                    idx.write(json.dumps(record, ensure_ascii=True) + "\n")
+                    slot = tail % ring_size
+                    count = slab_frames[slot]
+                    mono_ms, epoch_ms = slab_times[slot]
+                    overrun = slab_overrun[slot]
+                    wav_handle.write(slabs[slot, :count].tobytes())
+                    tail += 1
+                    batcher.append_line(
+                        _INDEX_TEMPLATE
+                        % (block_id, mono_ms, epoch_ms, count, channels, b"true" if overrun else b"false")
+                    )
                     self.stats.increment()
                     if overrun:
                         self.stats.add_overrun()
                     block_id += 1
+                pending = cb_overruns - folded_overruns
+                if pending:
+                    self.stats.add_overrun(pending)
+                batcher.flush()
 
         writer_thread = threading.Thread(target=writer, name="audio-writer", daemon=True)
         writer_thread.start()
@@ -269,8 +350,7 @@ class AudioCapture:
             dtype="int16",
             callback=callback,
         ):
-            while not self._stop_event.is_set():
-                time.sleep(0.1)
+            self._stop_event.wait()
 
         writer_stop.set()
         writer_thread.join(timeout=5)
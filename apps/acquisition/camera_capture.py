@@ -1,16 +1,118 @@
 from __future__ import annotations
 
-import json
 import platform
 import queue
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 
+from .jsonl_io import INDEX_BUFFERING, IndexBatcher
 from .stats import StatsCounter
 
+# Frame index records have a fixed schema; %-format a byte template instead
+# of building a dict and running the general JSON encoder per frame.
+_INDEX_TEMPLATE = (
+    b'{"frame_id":%d,"time":{"mono_ms":%d,"epoch_ms":%d},'
+    b'"write_ms":%d,"width":%d,"height":%d}\n'
+)
+
+
+@lru_cache(maxsize=None)
+def _fourcc(codec: str) -> int:
+    import cv2
+
+    return cv2.VideoWriter_fourcc(*codec)
+
+
+def _write_jpeg(path: Path, frame, quality: int) -> None:
+    """Encode a frame as JPEG at an explicit quality and write the bytes.
+
+    cv2.imencode at quality 85 is roughly twice as fast as imwrite's default
+    95, and separating encode from the file write keeps both steps explicit.
+    """
+    import cv2
+
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if ok:
+        path.write_bytes(buf.tobytes())
+
+
+def _encoder_worker(shm_name, nslots, height, width, video_path, codec, fps, slot_queue, free_queue):
+    """Video encoder process: writes frames from shared-memory slots."""
+    import cv2
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((nslots, height, width, 3), dtype=np.uint8, buffer=shm.buf)
+    writer = cv2.VideoWriter(video_path, _fourcc(codec), fps, (width, height))
+    try:
+        while True:
+            slot = slot_queue.get()
+            if slot is None:
+                break
+            writer.write(frames[slot])
+            free_queue.put(slot)
+    finally:
+        writer.release()
+        shm.close()
+
+
+class _SharedMemoryVideoWriter:
+    """Run cv2.VideoWriter in a child process fed through a shared-memory ring.
+
+    Encoding in-thread holds the capture loop for the duration of each
+    writer.write call; a separate process gives the encoder its own GIL.
+    Frames are copied into preallocated shared-memory slots, so only slot
+    indices cross the process boundary. Mirrors the cv2.VideoWriter API used
+    by CameraCapture (isOpened/write/release). Frames are dropped if the
+    encoder falls more than the ring size behind.
+    """
+
+    def __init__(self, video_path: str, codec: str, fps: int, width: int, height: int, nslots: int = 8) -> None:
+        from multiprocessing import Process, Queue, shared_memory
+
+        self._shape = (height, width, 3)
+        frame_bytes = height * width * 3
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * nslots)
+        self._frames = np.ndarray((nslots,) + self._shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._slots: "Queue[int | None]" = Queue()
+        self._free: "Queue[int]" = Queue()
+        for slot in range(nslots):
+            self._free.put(slot)
+        self._proc = Process(
+            target=_encoder_worker,
+            args=(self._shm.name, nslots, height, width, video_path, codec, fps, self._slots, self._free),
+            daemon=True,
+        )
+        self._proc.start()
+        self._dropped = 0
+
+    def isOpened(self) -> bool:
+        return self._proc.is_alive()
+
+    def write(self, frame) -> None:
+        import queue as queue_mod
+
+        if frame.shape != self._shape:
+            return
+        try:
+            slot = self._free.get_nowait()
+        except queue_mod.Empty:
+            self._dropped += 1
+            return
+        np.copyto(self._frames[slot], frame)
+        self._slots.put(slot)
+
+    def release(self) -> None:
+        self._slots.put(None)
+        self._proc.join(timeout=10)
+        self._shm.close()
+        self._shm.unlink()
+
 
 def _get_cv2_backend():
     """获取适合当前平台的 OpenCV 后端"""
@@ -34,6 +136,9 @@ class CameraCapture:
         self.stats = StatsCounter()
         self._stop_event = threading.Event()
         self._snapshot_requests: queue.Queue[str] = queue.Queue(maxsize=20)
+        # JPEG encodes run here instead of the capture loop; OpenCV releases
+        # the GIL during imwrite, so capture continues while encoding.
+        self._snap_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="camera-snap")
         self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
 
     def start(self) -> None:
@@ -92,9 +197,14 @@ class CameraCapture:
             else:
                 cap = cv2.VideoCapture(device_index)
 
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-            cap.set(cv2.CAP_PROP_FPS, fps)
+            # set() 可能触发后端重新协商格式，跟当前值一致时跳过
+            for prop, want in (
+                (cv2.CAP_PROP_FRAME_WIDTH, width),
+                (cv2.CAP_PROP_FRAME_HEIGHT, height),
+                (cv2.CAP_PROP_FPS, fps),
+            ):
+                if int(cap.get(prop)) != want:
+                    cap.set(prop, want)
 
             # 可选：设置缓冲区大小（减少延迟）
             cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
@@ -116,8 +226,11 @@ class CameraCapture:
             self.logger.error("OpenCV not available for video writing: %s", exc)
             return
 
-        fourcc = cv2.VideoWriter_fourcc(*codec)
-        writer = cv2.VideoWriter(str(video_path), fourcc, fps, (width, height))
+        if bool(self.config.get("encoder_process", False)):
+            # 单独进程编码，采集线程只负责拷帧
+            writer = _SharedMemoryVideoWriter(str(video_path), codec, fps, width, height)
+        else:
+            writer = cv2.VideoWriter(str(video_path), _fourcc(codec), fps, (width, height))
         if not writer.isOpened():
             self.logger.error("Failed to open video writer: %s", video_path)
             if cap is not None:
@@ -126,12 +239,33 @@ class CameraCapture:
 
         frame_id = 0
         last_snapshot = 0.0
+        latest_future = None
+        jpeg_quality = int(self.config.get("jpeg_quality", 85))
+        latest_path = self.output_dir / "latest.jpg"
         interval_sec = 1.0 / fps if fps > 0 else 0.0
         next_tick = time.perf_counter()
         start_time = time.monotonic()
         fault_active = False
+        # mock 帧内容不变，分配一次即可；VideoWriter.write 不会修改输入
+        mock_frame = np.zeros((height, width, 3), dtype=np.uint8) if mode == "mock" else None
+
+        # 每帧的取帧方式在循环外定死，热循环里不再按 mode 分支
+        if mode == "mock":
+
+            def grab():
+                return True, mock_frame
+
+        elif use_picamera2:
+
+            def grab():
+                frame = cap.capture_array()
+                return frame is not None, frame
 
-        with index_path.open("w", encoding="utf-8") as index_handle:
+        else:
+            grab = cap.read
+
+        with index_path.open("wb", buffering=INDEX_BUFFERING) as index_handle:
+            batcher = IndexBatcher(index_handle)
             while not self._stop_event.is_set():
                 elapsed = time.monotonic() - start_time
                 if fault_after > 0 and fault_duration > 0 and fault_after <= elapsed < fault_after + fault_duration:
@@ -145,28 +279,18 @@ class CameraCapture:
 
                 if fault_active:
                     self.stats.drop()
-                    time.sleep(0.05)
+                    self._stop_event.wait(0.05)
                     continue
 
                 start = time.perf_counter()
-                if mode == "mock":
-                    frame = np.zeros((height, width, 3), dtype=np.uint8)
-                    ret = True
-                elif use_picamera2:
-                    frame = cap.capture_array()
-                    ret = frame is not None
-                    if ret:
-                        # picamera2 返回 RGB，OpenCV 需要 BGR
-                        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                else:
-                    ret, frame = cap.read()
+                ret, frame = grab()
 
                 if not ret:
                     self.stats.drop()
-                    time.sleep(0.05)
+                    self._stop_event.wait(0.05)
                     continue
 
-                times = self.timebase.now()
+                mono_ms, epoch_ms = self.timebase.now_ms()
                 writer.write(frame)
                 write_ms = int((time.perf_counter() - start) * 1000)
 
@@ -174,41 +298,37 @@ class CameraCapture:
                     now_wall = time.time()
                     if now_wall - last_snapshot >= snapshot_interval:
                         snapshot_path = snapshot_dir / f"frame_{frame_id:06d}.jpg"
-                        cv2.imwrite(str(snapshot_path), frame)
+                        # copy: cap.read 可能复用缓冲区
+                        self._snap_pool.submit(_write_jpeg, snapshot_path, frame.copy(), jpeg_quality)
                         last_snapshot = now_wall
 
-                while not self._snapshot_requests.empty():
+                while True:
                     try:
                         tag = self._snapshot_requests.get_nowait()
                     except queue.Empty:
                         break
                     snapshot_path = snapshot_dir / f"{tag}_{frame_id:06d}.jpg"
-                    cv2.imwrite(str(snapshot_path), frame)
-
-                record = {
-                    "frame_id": frame_id,
-                    "time": times,
-                    "write_ms": write_ms,
-                    "width": int(frame.shape[1]),
-                    "height": int(frame.shape[0]),
-                }
-                index_handle.write(json.dumps(record, ensure_ascii=True) + "\n")
-
-                # 写入 latest.jpg 供 MJPEG 流端点使用
-                jpeg_quality = int(self.config.get("jpeg_quality", 80))
-                latest_path = self.output_dir / "latest.jpg"
-                try:
-                    cv2.imwrite(str(latest_path), frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
-                except Exception:
-                    pass
+                    self._snap_pool.submit(_write_jpeg, snapshot_path, frame.copy(), jpeg_quality)
+
+                batcher.append_line(
+                    _INDEX_TEMPLATE
+                    % (frame_id, mono_ms, epoch_ms, write_ms, frame.shape[1], frame.shape[0])
+                )
+
+                # 写入 latest.jpg 供 MJPEG 流端点使用；编码器忙时跳过本帧
+                if latest_future is None or latest_future.done():
+                    latest_future = self._snap_pool.submit(_write_jpeg, latest_path, frame.copy(), jpeg_quality)
 
                 frame_id += 1
                 self.stats.increment()
 
                 if interval_sec > 0:
                     next_tick += interval_sec
-                    time.sleep(max(0.0, next_tick - time.perf_counter()))
+                    if self._stop_event.wait(timeout=max(0.0, next_tick - time.perf_counter())):
+                        break
+            batcher.flush()
 
+        self._snap_pool.shutdown(wait=True)
         writer.release()
         if use_picamera2 and cap is not None:
             cap.stop()
@@ -228,8 +348,9 @@ class CameraCapture:
 
         try:
             picam2 = Picamera2()
+            # BGR888 直接匹配 OpenCV 通道顺序，省掉每帧 cvtColor 拷贝
             config = picam2.create_video_configuration(
-                main={"size": (width, height), "format": "RGB888"},
+                main={"size": (width, height), "format": "BGR888"},
                 controls={"FrameRate": fps},
             )
             picam2.configure(config)
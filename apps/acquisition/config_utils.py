@@ -4,10 +4,15 @@ from pathlib import Path
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # libyaml not compiled in; ~10x slower pure-Python loader
+    from yaml import SafeLoader as _SafeLoader
+
 
 def load_config(path: Path) -> dict:
     with path.open("r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
+        data = yaml.load(handle, Loader=_SafeLoader)
     if not isinstance(data, dict):
         raise ValueError("Config must be a mapping")
     return data
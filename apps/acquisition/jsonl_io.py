@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import gzip
+import json
+import time
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib fallback below
+    orjson = None
+
+# Large buffer for index/record files so the interpreter is not forced into
+# per-line flushes by the default buffering.
+INDEX_BUFFERING = 1 << 20
+
+
+if orjson is not None:
+
+    def dumps(record: dict) -> bytes:
+        return orjson.dumps(record)
+
+    def loads(line: bytes | str) -> dict:
+        return orjson.loads(line)
+
+else:
+
+    def dumps(record: dict) -> bytes:
+        # ensure_ascii=False 跳过逐字符 \uXXXX 转义扫描；UTF-8 字节
+        # 与 orjson 输出一致，JSONL 下游按 UTF-8 解析两者无差别
+        return json.dumps(record, ensure_ascii=False).encode("utf-8")
+
+    loads = json.loads
+
+
+def open_output(path, mode: str = "wb"):
+    """Open a JSONL output file for writing; ``*.gz`` paths gzip on the fly.
+
+    JSON compresses 20-30x, which matters for multi-hour runs on SD-card
+    storage. compresslevel=1 keeps the CPU cost on the writer thread small.
+    """
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=1)
+    return open(path, mode, buffering=INDEX_BUFFERING)
+
+
+class IndexBatcher:
+    """Batch JSONL records into a single writelines() call.
+
+    Writing one line per record costs a Python-level write per loop iteration,
+    which dominates index I/O at 30 fps video / 50 audio blocks per second.
+    Records are serialized with orjson when available (C serializer, several
+    times faster than stdlib json), buffered, and flushed once ``max_batch``
+    lines accumulate or ``max_interval`` seconds elapse, whichever comes
+    first. The handle must be opened in binary mode; call ``flush()`` before
+    closing it.
+    """
+
+    def __init__(self, handle, max_batch: int = 64, max_interval: float = 0.5) -> None:
+        self._handle = handle
+        self._max_batch = max_batch
+        self._max_interval = max_interval
+        self._pending: list[bytes] = []
+        self._last_flush = time.monotonic()
+
+    def append(self, record: dict) -> None:
+        self.append_line(dumps(record) + b"\n")
+
+    def append_line(self, line: bytes) -> None:
+        """Queue an already-serialized JSONL line (must end with a newline).
+
+        Lets fixed-schema hot loops skip the dict build and the general
+        encoder entirely by %-formatting a byte template.
+        """
+        self._pending.append(line)
+        if len(self._pending) >= self._max_batch or time.monotonic() - self._last_flush >= self._max_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            # One gathered write per flush; the buffered handle then issues a
+            # single kernel write when its own buffer fills.
+            self._handle.write(b"".join(self._pending))
+            self._pending.clear()
+        self._last_flush = time.monotonic()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 
@@ -16,12 +19,21 @@ def setup_logging(level: str, log_dir: Path, run_id: str) -> logging.Logger:
 
     console = logging.StreamHandler()
     console.setFormatter(formatter)
-    logger.addHandler(console)
 
     log_dir.mkdir(parents=True, exist_ok=True)
     file_path = log_dir / f"run_{run_id}.log"
-    file_handler = logging.FileHandler(file_path, encoding="utf-8")
+    # 64 KiB buffer instead of line buffering; the listener thread below is
+    # the only writer, so capture threads never block on disk.
+    file_stream = open(file_path, "a", encoding="utf-8", buffering=64 * 1024)
+    file_handler = logging.StreamHandler(file_stream)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    # Capture threads only enqueue records; formatting and I/O happen on the
+    # listener's background thread.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
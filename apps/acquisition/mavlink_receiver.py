@@ -10,13 +10,13 @@ MAVLink 遥测接收器
 from __future__ import annotations
 
 import argparse
-import json
+import collections
+import os
 import sys
 import threading
 import time
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from queue import Queue
 
 
 def _add_repo_to_path() -> Path:
@@ -28,8 +28,11 @@ def _add_repo_to_path() -> Path:
 
 repo_root = _add_repo_to_path()
 
+from apps.acquisition.jsonl_io import dumps as jsonl_dumps, open_output  # noqa: E402
 from src.common.timebase import TimeBase  # noqa: E402
 
+_RAD2DEG = 57.29577951308232  # 180/pi
+
 
 @dataclass
 class TelemetryData:
@@ -67,6 +70,10 @@ class TelemetryData:
 class MavlinkTelemetryReceiver:
     """MAVLink遥测接收器"""
 
+    # 只接这 5 类消息；其余（PARAM_VALUE/STATUSTEXT/RC_CHANNELS 等约占流量
+    # 70%）由 pymavlink 在返回 Python 前就过滤掉
+    _MAVLINK_TYPES = ["ATTITUDE", "GLOBAL_POSITION_INT", "VFR_HUD", "SYS_STATUS", "HEARTBEAT"]
+
     def __init__(
         self,
         conn_str: str,
@@ -79,7 +86,25 @@ class MavlinkTelemetryReceiver:
         self._timebase = TimeBase()
         self._running = False
         self._master = None
-        self._queue: Queue[TelemetryData] = Queue(maxsize=100)
+        # 单生产者单消费者：deque 的 append/popleft 在 GIL 下本身原子，
+        # 不需要 queue.Queue 每次 put/get 的互斥锁；Event 只用来唤醒写线程
+        self._ring: collections.deque[bytes] = collections.deque(maxlen=100)
+        self._data_ready = threading.Event()
+        self._drops = 0  # 写线程跟不上时被挤掉的记录数
+
+        # 输出记录模板：结构固定，接收线程只就地改字段后立即序列化，
+        # 避免每条记录重建 7 个嵌套 dict
+        self._record = {
+            "version": "0.1",
+            "time": None,
+            "attitude": {"roll_deg": 0.0, "pitch_deg": 0.0, "yaw_deg": 0.0},
+            "position": {"lat": None, "lon": None, "alt_m": None, "relative_alt_m": None},
+            "velocity": {"vx": None, "vy": None, "vz": None, "groundspeed": None},
+            "battery": {"voltage": None, "remaining_pct": None},
+            "armed": False,
+            "mode": "UNKNOWN",
+            "link_status": "OK",
+        }
 
         # 缓存最新数据
         self._attitude = {"roll": 0, "pitch": 0, "yaw": 0}
@@ -87,6 +112,16 @@ class MavlinkTelemetryReceiver:
         self._velocity = {"vx": None, "vy": None, "vz": None, "gs": None}
         self._battery = {"voltage": None, "remaining": None}
         self._status = {"armed": False, "mode": "UNKNOWN"}
+        # custom_mode → 模式名反查表；模式表运行期不变，连接成功后构建一次
+        self._mode_map_rev: dict[int, str] = {}
+        # 消息类型 → 处理函数：一次哈希查找代替逐个字符串比较
+        self._dispatch = {
+            "ATTITUDE": self._handle_attitude,
+            "GLOBAL_POSITION_INT": self._handle_position,
+            "VFR_HUD": self._handle_vfr_hud,
+            "SYS_STATUS": self._handle_sys_status,
+            "HEARTBEAT": self._handle_heartbeat,
+        }
 
     def _connect(self) -> bool:
         """建立MAVLink连接"""
@@ -97,6 +132,9 @@ class MavlinkTelemetryReceiver:
             hb = self._master.wait_heartbeat(timeout=10)
             if hb:
                 print(f"✓ 连接成功 - 系统ID: {self._master.target_system}")
+                self._mode_map_rev = {
+                    v: k for k, v in (self._master.mode_mapping() or {}).items()
+                }
                 return True
             else:
                 print("✗ 心跳超时")
@@ -107,35 +145,35 @@ class MavlinkTelemetryReceiver:
 
     def _process_message(self, msg) -> None:
         """处理MAVLink消息"""
-        msg_type = msg.get_type()
-
-        if msg_type == "ATTITUDE":
-            self._attitude["roll"] = round(msg.roll * 57.2958, 2)  # rad to deg
-            self._attitude["pitch"] = round(msg.pitch * 57.2958, 2)
-            self._attitude["yaw"] = round(msg.yaw * 57.2958, 2)
-
-        elif msg_type == "GLOBAL_POSITION_INT":
-            self._position["lat"] = msg.lat / 1e7
-            self._position["lon"] = msg.lon / 1e7
-            self._position["alt"] = msg.alt / 1000.0
-            self._position["rel_alt"] = msg.relative_alt / 1000.0
-            self._velocity["vx"] = msg.vx / 100.0
-            self._velocity["vy"] = msg.vy / 100.0
-            self._velocity["vz"] = msg.vz / 100.0
-
-        elif msg_type == "VFR_HUD":
-            self._velocity["gs"] = msg.groundspeed
-
-        elif msg_type == "SYS_STATUS":
-            self._battery["voltage"] = msg.voltage_battery / 1000.0
-            self._battery["remaining"] = msg.battery_remaining
-
-        elif msg_type == "HEARTBEAT":
-            self._status["armed"] = (msg.base_mode & 128) != 0
-            # 获取模式名称
-            mode_mapping = self._master.mode_mapping()
-            mode_mapping_rev = {v: k for k, v in mode_mapping.items()}
-            self._status["mode"] = mode_mapping_rev.get(msg.custom_mode, f"MODE_{msg.custom_mode}")
+        handler = self._dispatch.get(msg.get_type())
+        if handler is not None:
+            handler(msg)
+
+    def _handle_attitude(self, msg) -> None:
+        # ATTITUDE 频率 10-50Hz，存全精度值；显示精度由输出端格式化决定
+        self._attitude["roll"] = msg.roll * _RAD2DEG
+        self._attitude["pitch"] = msg.pitch * _RAD2DEG
+        self._attitude["yaw"] = msg.yaw * _RAD2DEG
+
+    def _handle_position(self, msg) -> None:
+        self._position["lat"] = msg.lat / 1e7
+        self._position["lon"] = msg.lon / 1e7
+        self._position["alt"] = msg.alt / 1000.0
+        self._position["rel_alt"] = msg.relative_alt / 1000.0
+        self._velocity["vx"] = msg.vx / 100.0
+        self._velocity["vy"] = msg.vy / 100.0
+        self._velocity["vz"] = msg.vz / 100.0
+
+    def _handle_vfr_hud(self, msg) -> None:
+        self._velocity["gs"] = msg.groundspeed
+
+    def _handle_sys_status(self, msg) -> None:
+        self._battery["voltage"] = msg.voltage_battery / 1000.0
+        self._battery["remaining"] = msg.battery_remaining
+
+    def _handle_heartbeat(self, msg) -> None:
+        self._status["armed"] = (msg.base_mode & 128) != 0
+        self._status["mode"] = self._mode_map_rev.get(msg.custom_mode, f"MODE_{msg.custom_mode}")
 
     def _build_telemetry(self) -> TelemetryData:
         """构建遥测数据"""
@@ -159,6 +197,31 @@ class MavlinkTelemetryReceiver:
             link_status="OK",
         )
 
+    def _build_record(self) -> dict:
+        """把缓存的最新状态填进输出模板（就地覆盖，不分配新 dict）"""
+        data = self._record
+        data["time"] = self._timebase.now()
+        attitude = data["attitude"]
+        attitude["roll_deg"] = self._attitude["roll"]
+        attitude["pitch_deg"] = self._attitude["pitch"]
+        attitude["yaw_deg"] = self._attitude["yaw"]
+        position = data["position"]
+        position["lat"] = self._position["lat"]
+        position["lon"] = self._position["lon"]
+        position["alt_m"] = self._position["alt"]
+        position["relative_alt_m"] = self._position["rel_alt"]
+        velocity = data["velocity"]
+        velocity["vx"] = self._velocity["vx"]
+        velocity["vy"] = self._velocity["vy"]
+        velocity["vz"] = self._velocity["vz"]
+        velocity["groundspeed"] = self._velocity["gs"]
+        battery = data["battery"]
+        battery["voltage"] = self._battery["voltage"]
+        battery["remaining_pct"] = self._battery["remaining"]
+        data["armed"] = self._status["armed"]
+        data["mode"] = self._status["mode"]
+        return data
+
     def _receive_loop(self) -> None:
         """接收循环"""
         last_write = 0
@@ -171,18 +234,21 @@ class MavlinkTelemetryReceiver:
                     continue
 
             try:
-                msg = self._master.recv_match(blocking=True, timeout=1)
+                msg = self._master.recv_match(type=self._MAVLINK_TYPES, blocking=True, timeout=1)
                 if msg:
                     self._process_message(msg)
 
                 # 定期写入
                 now = time.monotonic()
                 if now - last_write >= write_interval:
-                    telemetry = self._build_telemetry()
-                    try:
-                        self._queue.put_nowait(telemetry)
-                    except:
-                        pass
+                    # 序列化紧跟在模板覆盖之后，模板可以安全复用；
+                    # 环满时 deque 自动丢最旧的一条，计数而不是无声吞掉
+                    if len(self._ring) == self._ring.maxlen:
+                        self._drops += 1
+                        if self._drops % 50 == 1:
+                            print(f"⚠ 遥测写入积压，已丢弃 {self._drops} 条")
+                    self._ring.append(jsonl_dumps(self._build_record()) + b"\n")
+                    self._data_ready.set()
                     last_write = now
 
             except Exception as e:
@@ -192,45 +258,48 @@ class MavlinkTelemetryReceiver:
 
     def _write_loop(self) -> None:
         """写入循环"""
-        while self._running:
-            try:
-                telemetry = self._queue.get(timeout=1)
-                data = {
-                    "version": "0.1",
-                    "time": telemetry.time,
-                    "attitude": {
-                        "roll_deg": telemetry.roll_deg,
-                        "pitch_deg": telemetry.pitch_deg,
-                        "yaw_deg": telemetry.yaw_deg,
-                    },
-                    "position": {
-                        "lat": telemetry.lat,
-                        "lon": telemetry.lon,
-                        "alt_m": telemetry.alt_m,
-                        "relative_alt_m": telemetry.relative_alt_m,
-                    },
-                    "velocity": {
-                        "vx": telemetry.vx,
-                        "vy": telemetry.vy,
-                        "vz": telemetry.vz,
-                        "groundspeed": telemetry.groundspeed,
-                    },
-                    "battery": {
-                        "voltage": telemetry.battery_voltage,
-                        "remaining_pct": telemetry.battery_remaining_pct,
-                    },
-                    "armed": telemetry.armed,
-                    "mode": telemetry.mode,
-                    "link_status": telemetry.link_status,
-                }
-                self._output_path.parent.mkdir(parents=True, exist_ok=True)
-                with self._output_path.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(data, ensure_ascii=True) + "\n")
-            except:
-                pass
+        # 普通路径直接持有 fd，每批一个 os.write 系统调用即落内核页缓存，
+        # 绕过 BufferedWriter 的锁和二次拷贝；.gz 输出仍走 gzip 文件对象
+        gz = str(self._output_path).endswith(".gz")
+        if gz:
+            out = open_output(self._output_path, "ab")
+        else:
+            fd = os.open(str(self._output_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        writes = 0
+        ring = self._ring
+        try:
+            while self._running:
+                if not self._data_ready.wait(timeout=1):
+                    continue
+                self._data_ready.clear()
+                if not ring:
+                    continue
+                # 把积压的行拼成一块连续缓冲，整批提交而不是逐条
+                batch = bytearray()
+                while ring:
+                    batch += ring.popleft()
+                try:
+                    if gz:
+                        out.write(bytes(batch))
+                        writes += 1
+                        if writes >= 20:
+                            out.flush()
+                            writes = 0
+                    else:
+                        os.write(fd, batch)
+                except OSError as e:
+                    # 磁盘停顿时明确报错并退避，而不是无声丢记录
+                    print(f"遥测写入错误: {e}")
+                    time.sleep(1)
+        finally:
+            if gz:
+                out.close()
+            else:
+                os.close(fd)
 
     def start(self) -> None:
         """启动接收器"""
+        self._output_path.parent.mkdir(parents=True, exist_ok=True)
         self._running = True
         self._recv_thread = threading.Thread(target=self._receive_loop, daemon=True)
         self._write_thread = threading.Thread(target=self._write_loop, daemon=True)
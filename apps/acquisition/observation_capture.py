@@ -1,12 +1,55 @@
 from __future__ import annotations
 
-import json
+import os
 import threading
 import time
 from pathlib import Path
 
+from .jsonl_io import dumps, loads, open_output
 from .stats import StatsCounter
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # 无 inotify 支持时回退到轮询
+    INotify = None
+
+
+def _emit(handle, record: dict, state: list) -> None:
+    """写一行 JSONL；每 16 条或 200ms flush 一次，而不是每条记录刷一次盘
+
+    state 是 [自上次 flush 的条数, 上次 flush 的 monotonic 时刻]，
+    由调用方在循环外初始化为 [0, time.monotonic()]。
+    """
+    handle.write(dumps(record) + b"\n")
+    state[0] += 1
+    now = time.monotonic()
+    if state[0] >= 16 or now - state[1] >= 0.2:
+        handle.flush()
+        state[0] = 0
+        state[1] = now
+
+
+def _to_obs(rec: dict | None, now_ms: int, max_gap_ms: int):
+    """将最新记录转为 Observation，超时或无信号则置 None"""
+    from src.fusion.simple_fusion import Observation
+
+    if rec is None:
+        return None
+    if rec.get("bearing_deg") is None:
+        return None
+    rec_ms = rec.get("time", {}).get("epoch_ms", 0)
+    if now_ms - rec_ms > max_gap_ms:
+        return None  # 数据过旧
+    return Observation(
+        time=rec.get("time", {}),
+        source=rec.get("source", "unknown"),
+        bearing_deg=rec.get("bearing_deg"),
+        roi=rec.get("roi"),
+        confidence=rec.get("confidence"),
+        status=rec.get("status", "NO_SIGNAL"),
+        extras=rec.get("extras"),
+    )
+
 
 class ObservationCapture:
     def __init__(self, config: dict, output_dir: Path, timebase, logger) -> None:
@@ -27,6 +70,10 @@ class ObservationCapture:
     def join(self, timeout: float | None = None) -> None:
         self._thread.join(timeout)
 
+    def _output_name(self, stem: str) -> str:
+        """配置 compress: true 时加 .gz 后缀，open_output 据此启用 gzip"""
+        return stem + ".gz" if bool(self.config.get("compress", False)) else stem
+
     def _run(self) -> None:
         if not self.config.get("enabled", True):
             self.logger.info("Observation disabled")
@@ -61,36 +108,40 @@ class ObservationCapture:
             {"x": 320, "y": 180, "w": 200, "h": 200, "frame_w": 1280, "frame_h": 720},
         )
 
-        output_path = self.output_dir / "observations.jsonl"
+        output_path = self.output_dir / self._output_name("observations.jsonl")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         seq = 0
         next_tick = time.perf_counter()
-        with output_path.open("w", encoding="utf-8") as handle:
+        emit_state = [0, time.monotonic()]
+        # 记录骨架循环外建一次；每 tick 只变 time/extras.mock_seq，
+        # OK 状态下再加 bearing（roi/confidence 是常量，提前填好）
+        ok = status == "OK"
+        extras = {"mock_seq": 0}
+        record = {
+            "version": "0.1",
+            "time": None,
+            "source": source,
+            "bearing_deg": None,
+            "roi": roi if ok else None,
+            "confidence": confidence if ok else None,
+            "status": status,
+            "extras": extras,
+        }
+        timebase_now = self.timebase.now  # 热循环外绑定，省每 tick 两级属性查找
+        with open_output(output_path) as handle:
             while not self._stop_event.is_set():
-                times = self.timebase.now()
-                bearing = None
-                use_roi = None
-                use_conf = None
-                if status == "OK":
-                    bearing = (bearing_start + seq * bearing_step) % 360
-                    use_roi = roi
-                    use_conf = confidence
-                record = {
-                    "version": "0.1",
-                    "time": times,
-                    "source": source,
-                    "bearing_deg": bearing,
-                    "roi": use_roi,
-                    "confidence": use_conf,
-                    "status": status,
-                    "extras": {"mock_seq": seq},
-                }
-                handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+                record["time"] = timebase_now()
+                extras["mock_seq"] = seq
+                if ok:
+                    record["bearing_deg"] = (bearing_start + seq * bearing_step) % 360
+                _emit(handle, record, emit_state)
                 self.stats.increment()
                 seq += 1
                 next_tick += interval
-                time.sleep(max(0.0, next_tick - time.perf_counter()))
+                # stop() 置位时立刻醒来，不用等满一个 interval
+                if self._stop_event.wait(timeout=max(0.0, next_tick - time.perf_counter())):
+                    break
 
     def _run_vision_live(self) -> None:
         """Tail vision_yolo.jsonl written by yolo_infer.py and forward to observations.jsonl."""
@@ -98,7 +149,7 @@ class ObservationCapture:
         source_filename = str(self.config.get("vision_live_source", "vision_yolo.jsonl"))
 
         source_path = self.output_dir / source_filename
-        output_path = self.output_dir / "observations.jsonl"
+        output_path = self.output_dir / self._output_name("observations.jsonl")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.logger.info("ObservationCapture vision_live: tailing %s", source_path)
@@ -114,24 +165,48 @@ class ObservationCapture:
 
         self.logger.info("ObservationCapture vision_live: source file found, streaming")
 
-        file_pos = 0
-        with output_path.open("w", encoding="utf-8") as out_handle:
+        # 有 inotify 时在内核里等 MODIFY 事件，空闲期零唤醒；
+        # 否则回退到固定间隔轮询
+        watcher = None
+        if INotify is not None:
+            try:
+                watcher = INotify()
+                watcher.add_watch(str(source_path), inotify_flags.MODIFY)
+            except OSError:
+                watcher = None
+        wait_ms = int(max(poll_interval, 0.1) * 1000)
+
+        emit_state = [0, time.monotonic()]
+        with open_output(output_path) as out_handle, source_path.open(
+            "rb", buffering=1 << 16
+        ) as src_handle:
             while not self._stop_event.is_set():
-                with source_path.open("r", encoding="utf-8") as src_handle:
-                    src_handle.seek(file_pos)
-                    for line in src_handle:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            record = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-                        out_handle.write(json.dumps(record, ensure_ascii=True) + "\n")
-                        out_handle.flush()
-                        self.stats.increment()
-                    file_pos = src_handle.tell()
-                time.sleep(poll_interval)
+                forwarded = 0
+                for line in src_handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = loads(line)
+                    except ValueError:
+                        continue
+                    _emit(out_handle, record, emit_state)
+                    forwarded += 1
+                # 计数整批提交一次，内层循环不反复拿 StatsCounter 的锁
+                if forwarded:
+                    self.stats.increment(forwarded)
+                # 批尾补一次 flush，消费方延迟上限就是等待间隔
+                if emit_state[0]:
+                    out_handle.flush()
+                    emit_state[0] = 0
+                    emit_state[1] = time.monotonic()
+                if watcher is not None:
+                    # 有限超时保证 stop_event 仍能及时生效
+                    watcher.read(timeout=wait_ms)
+                else:
+                    self._stop_event.wait(poll_interval)
+            if watcher is not None:
+                watcher.close()
 
     def _run_fused_live(self) -> None:
         """实时融合三路观测：vision_yolo + thermal_obs + doa_obs → fused.jsonl。
@@ -139,7 +214,7 @@ class ObservationCapture:
         每路独立 tail，按最新记录取置信度加权均值方位角。
         某路文件不存在时降级处理（不报错，直接跳过该路信号）。
         """
-        from src.fusion.simple_fusion import Observation, fuse3  # 延迟导入避免循环
+        from src.fusion.simple_fusion import fuse3  # 延迟导入避免循环
 
         poll_interval = float(self.config.get("fused_live_poll_sec", 0.1))
         emit_interval = float(self.config.get("fused_emit_interval_sec", 0.2))
@@ -154,102 +229,114 @@ class ObservationCapture:
         }
 
         obs_dir = self.output_dir
-        output_path = obs_dir / "fused.jsonl"
+        output_path = obs_dir / self._output_name("fused.jsonl")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         positions: dict[str, int] = {k: 0 for k in source_files}
         latest: dict[str, dict | None] = {k: None for k in source_files}
+        # 每路文件只打开一次，句柄自身记录读取位置；
+        # 出错时关掉置 None，下一轮按记录的位置重新打开
+        handles: dict[str, object | None] = {k: None for k in source_files}
 
         last_emit = 0.0
         last_no_signal = 0.0
+        emit_state = [0, time.monotonic()]
 
         self.logger.info("ObservationCapture fused_live: fusing %s", list(source_files.keys()))
 
-        with output_path.open("w", encoding="utf-8") as out_handle:
-            while not self._stop_event.is_set():
-                now_ms = int(time.time() * 1000)
-
-                # Tail 每个来源文件
-                for src, filename in source_files.items():
-                    path = obs_dir / filename
-                    if not path.exists():
-                        continue
-                    try:
-                        with path.open("r", encoding="utf-8") as f:
-                            f.seek(positions[src])
+        try:
+            with open_output(output_path) as out_handle:
+                while not self._stop_event.is_set():
+                    # Tail 每个来源文件
+                    for src, filename in source_files.items():
+                        f = handles[src]
+                        if f is None:
+                            path = obs_dir / filename
+                            if not path.exists():
+                                continue
+                            try:
+                                f = path.open("rb", buffering=1 << 16)
+                                f.seek(positions[src])
+                            except OSError:
+                                continue
+                            handles[src] = f
+                        try:
+                            # 没有新字节时一个 fstat 就能跳过整个读循环
+                            if os.fstat(f.fileno()).st_size == positions[src]:
+                                continue
                             for line in f:
                                 line = line.strip()
-                                if line:
-                                    try:
-                                        latest[src] = json.loads(line)
-                                    except json.JSONDecodeError:
-                                        pass
+                                if not line:
+                                    continue
+                                # bearing 为空的记录 to_obs 必然丢弃，
+                                # 先做廉价字节扫描省掉整行解析；但 NO_SIGNAL
+                                # 要立即把该路挤出融合，不能留着旧 bearing
+                                # 撑满 max_gap 窗口
+                                if b'"bearing_deg":null' in line or b'"bearing_deg": null' in line:
+                                    latest[src] = None
+                                    continue
+                                try:
+                                    latest[src] = loads(line)
+                                except ValueError:
+                                    pass
                             positions[src] = f.tell()
-                    except OSError:
-                        pass
+                        except OSError:
+                            try:
+                                f.close()
+                            except OSError:
+                                pass
+                            handles[src] = None
+
+                    now = time.time()
+                    if now - last_emit < emit_interval:
+                        time.sleep(poll_interval)
+                        continue
 
-                now = time.time()
-                if now - last_emit < emit_interval:
-                    time.sleep(poll_interval)
-                    continue
-
-                last_emit = now
-
-                # 将最新记录转为 Observation，超时或无信号则置 None
-                def to_obs(rec: dict | None) -> Observation | None:
-                    if rec is None:
-                        return None
-                    if rec.get("bearing_deg") is None:
-                        return None
-                    rec_ms = rec.get("time", {}).get("epoch_ms", 0)
-                    if now_ms - rec_ms > max_gap_ms:
-                        return None  # 数据过旧
-                    return Observation(
-                        time=rec.get("time", {}),
-                        source=rec.get("source", "unknown"),
-                        bearing_deg=rec.get("bearing_deg"),
-                        roi=rec.get("roi"),
-                        confidence=rec.get("confidence"),
-                        status=rec.get("status", "NO_SIGNAL"),
-                        extras=rec.get("extras"),
-                    )
-
-                vis = to_obs(latest.get("vision"))
-                therm = to_obs(latest.get("thermal"))
-                aud = to_obs(latest.get("audio"))
-
-                fused = fuse3(vis, therm, aud)
-
-                if fused is not None:
-                    record = {
-                        "version": "0.1",
-                        "time": fused.time,
-                        "source": "fusion",
-                        "bearing_deg": fused.bearing_deg,
-                        "roi": fused.roi,
-                        "confidence": fused.confidence,
-                        "status": fused.status,
-                        "extras": fused.extras,
-                    }
-                    out_handle.write(json.dumps(record, ensure_ascii=True) + "\n")
-                    out_handle.flush()
-                    self.stats.increment()
-                else:
-                    # 全路 NO_SIGNAL，限速发送
-                    if now - last_no_signal >= no_signal_interval:
+                    last_emit = now
+                    # 只在真正 emit 时取整数毫秒（整除，不走浮点乘法）
+                    now_ms = time.time_ns() // 1_000_000
+
+                    vis = _to_obs(latest.get("vision"), now_ms, max_gap_ms)
+                    therm = _to_obs(latest.get("thermal"), now_ms, max_gap_ms)
+                    aud = _to_obs(latest.get("audio"), now_ms, max_gap_ms)
+
+                    fused = fuse3(vis, therm, aud)
+
+                    if fused is not None:
                         record = {
                             "version": "0.1",
-                            "time": self.timebase.now(),
+                            "time": fused.time,
                             "source": "fusion",
-                            "bearing_deg": None,
-                            "roi": None,
-                            "confidence": None,
-                            "status": "NO_SIGNAL",
-                            "extras": {"sources": []},
+                            "bearing_deg": fused.bearing_deg,
+                            "roi": fused.roi,
+                            "confidence": fused.confidence,
+                            "status": fused.status,
+                            "extras": fused.extras,
                         }
-                        out_handle.write(json.dumps(record, ensure_ascii=True) + "\n")
-                        out_handle.flush()
+                        _emit(out_handle, record, emit_state)
                         self.stats.increment()
-                        last_no_signal = now
+                    else:
+                        # 全路 NO_SIGNAL，限速发送
+                        if now - last_no_signal >= no_signal_interval:
+                            record = {
+                                "version": "0.1",
+                                "time": self.timebase.now(),
+                                "source": "fusion",
+                                "bearing_deg": None,
+                                "roi": None,
+                                "confidence": None,
+                                "status": "NO_SIGNAL",
+                                "extras": {"sources": []},
+                            }
+                            _emit(out_handle, record, emit_state)
+                            self.stats.increment()
+                            last_no_signal = now
 
-                time.sleep(poll_interval)
+                    time.sleep(poll_interval)
+        finally:
+            for f in handles.values():
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
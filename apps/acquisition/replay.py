@@ -1,26 +1,68 @@
 from __future__ import annotations
 
 import argparse
-import json
+import heapq
+import itertools
+import os
 import sys
 import time
 from pathlib import Path
+from typing import Iterable, Iterator
 
 
-def load_jsonl(path: Path) -> list[dict]:
+def _add_repo_to_path() -> Path:
+    repo_root = Path(__file__).resolve().parents[2]
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    return repo_root
+
+
+repo_root = _add_repo_to_path()
+
+from apps.acquisition.jsonl_io import dumps, loads  # noqa: E402
+
+
+def _pick_mono_getter(record: dict):
+    """按首条记录的 schema 绑定专用取时间函数。
+
+    同一个流里所有记录的时间字段位置相同，探测一次后就能用直取
+    代替 get_mono_ms 每条记录的 isinstance + 多键回退。
+    """
+    time_obj = record.get("time")
+    if isinstance(time_obj, dict):
+        if "mono_ms" in time_obj:
+            return lambda r: int(r["time"]["mono_ms"])
+        if "t_mono_ms" in time_obj:
+            return lambda r: int(r["time"]["t_mono_ms"])
+    if "mono_ms" in record:
+        return lambda r: int(r["mono_ms"])
+    if "t_mono_ms" in record:
+        return lambda r: int(r["t_mono_ms"])
+    return get_mono_ms
+
+
+def iter_jsonl(path: Path, stream_label: str) -> Iterator[tuple[int, dict]]:
+    """惰性逐行读取一个 JSONL 文件，yield (mono_ms, 带 stream 标签的记录)"""
     if not path.exists():
-        return []
-    records = []
-    with path.open("r", encoding="utf-8") as handle:
+        return
+    getter = None
+    with path.open("rb") as handle:
         for line in handle:
             line = line.strip()
             if not line:
                 continue
             try:
-                records.append(json.loads(line))
-            except json.JSONDecodeError:
+                record = loads(line)
+            except ValueError:
                 continue
-    return records
+            record = {"stream": stream_label, **record}
+            if getter is None:
+                getter = _pick_mono_getter(record)
+            try:
+                ts = getter(record)
+            except (KeyError, TypeError):  # 个别记录偏离流 schema 时兜底
+                ts = get_mono_ms(record)
+            yield ts, record
 
 
 def get_mono_ms(record: dict) -> int:
@@ -41,65 +83,69 @@ def get_mono_ms(record: dict) -> int:
 def find_latest_run(runs_root: Path) -> Path | None:
     if not runs_root.exists():
         return None
-    candidates = [p for p in runs_root.iterdir() if p.is_dir()]
+    # scandir 的 DirEntry 自带 stat 缓存：每个条目一次 stat，
+    # is_dir + st_mtime 不再各打一次；取最新用 max 而不用全排序
+    with os.scandir(runs_root) as entries:
+        candidates = [(entry.stat().st_mtime, entry.path) for entry in entries if entry.is_dir()]
     if not candidates:
         return None
-    candidates.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return candidates[0]
-
+    return Path(max(candidates)[1])
 
-def build_events(run_dir: Path) -> list[dict]:
-    events = []
-    video_index = run_dir / "video" / "frame_index.jsonl"
-    audio_index = run_dir / "audio" / "audio_index.jsonl"
-    telemetry_path = run_dir / "telemetry" / "telemetry.jsonl"
-    observations_dir = run_dir / "observations"
-    event_path = run_dir / "events.jsonl"
-
-    for record in load_jsonl(video_index):
-        events.append({"stream": "video", **record})
-    for record in load_jsonl(audio_index):
-        events.append({"stream": "audio", **record})
-    for record in load_jsonl(telemetry_path):
-        events.append({"stream": "telemetry", **record})
-    if observations_dir.exists():
-        for obs_file in observations_dir.glob("*.jsonl"):
-            for record in load_jsonl(obs_file):
-                events.append({"stream": f"observation:{obs_file.stem}", **record})
-    for record in load_jsonl(event_path):
-        events.append({"stream": "event", **record})
 
-    events.sort(key=get_mono_ms)
-    return events
+def build_events(run_dir: Path) -> Iterator[dict]:
+    """按 mono_ms 归并各路事件流。
 
+    每个 JSONL 文件本身已按时间单调递增，heapq.merge 流式归并即可，
+    峰值内存只与流的数量有关，而不是整个 run 的事件总数。
+    """
+    observations_dir = run_dir / "observations"
 
-def replay_events(events: list[dict], speed: float, output_path: Path | None) -> None:
-    if not events:
+    streams: list[tuple[str, Path]] = [
+        ("video", run_dir / "video" / "frame_index.jsonl"),
+        ("audio", run_dir / "audio" / "audio_index.jsonl"),
+        ("telemetry", run_dir / "telemetry" / "telemetry.jsonl"),
+    ]
+    if observations_dir.exists():
+        # scandir 直接按文件名后缀筛，不走 glob 的模式匹配和逐项 Path 构造
+        with os.scandir(observations_dir) as entries:
+            obs_names = sorted(e.name for e in entries if e.name.endswith(".jsonl"))
+        for name in obs_names:
+            streams.append((f"observation:{name[:-len('.jsonl')]}", observations_dir / name))
+    streams.append(("event", run_dir / "events.jsonl"))
+
+    iterators = [iter_jsonl(path, label) for label, path in streams]
+    return (record for _, record in heapq.merge(*iterators, key=lambda item: item[0]))
+
+
+def replay_events(events: Iterable[dict], speed: float, output_path: Path | None) -> None:
+    events = iter(events)
+    try:
+        first = next(events)
+    except StopIteration:
         print("No events to replay")
         return
 
     handle = None
     if output_path:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        handle = output_path.open("w", encoding="utf-8")
+        handle = output_path.open("wb", buffering=64 * 1024)
 
-    start_mono = get_mono_ms(events[0])
+    start_mono = get_mono_ms(first)
     start_time = time.perf_counter()
 
-    for event in events:
+    for event in itertools.chain((first,), events):
         t_mono = get_mono_ms(event) or start_mono
         if speed > 0:
+            # 一次睡到目标时刻，不用 1ms 轮询空转
             target_elapsed = (t_mono - start_mono) / 1000.0 / speed
-            while True:
-                now = time.perf_counter() - start_time
-                if now >= target_elapsed:
-                    break
-                time.sleep(0.001)
-        line = json.dumps(event, ensure_ascii=True)
+            delay = target_elapsed - (time.perf_counter() - start_time)
+            if delay > 0:
+                time.sleep(delay)
+        line = dumps(event)
         if handle:
-            handle.write(line + "\n")
+            handle.write(line + b"\n")
         else:
-            print(line)
+            print(line.decode("utf-8"))
 
     if handle:
         handle.close()
@@ -112,7 +158,6 @@ def main() -> int:
     parser.add_argument("--output", help="Optional JSONL output path")
     args = parser.parse_args()
 
-    repo_root = Path(__file__).resolve().parents[2]
     runs_root = repo_root / "runs"
 
     if args.run == "latest":
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import logging
+import os
+import signal
 import sys
+import threading
 import time
 from pathlib import Path
 
+# 采集循环里的 numpy 运算都很小（20ms 音频块等），BLAS/OpenMP 线程池的
+# fork-join 开销远大于运算本身；必须在任何模块间接 import numpy 之前设置。
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
 
 def _add_repo_to_path() -> Path:
     repo_root = Path(__file__).resolve().parents[2]
@@ -25,20 +35,25 @@ from src.common.run_manager import RunManager  # noqa: E402
 from src.common.timebase import TimeBase  # noqa: E402
 
 
-def log_stats(logger, label: str, stats, warn_below: float | None = None, overrun_warn: int | None = None) -> None:
-    snap = stats.snapshot()
-    logger.info(
-        "%s rate=%.2fHz total=%d dropped=%d overrun=%d",
-        label,
-        snap["rate_hz"],
-        snap["total"],
-        snap["dropped"],
-        snap["overrun"],
-    )
-    if warn_below is not None and snap["rate_hz"] > 0 and snap["rate_hz"] < warn_below:
-        logger.warning("%s rate below target: %.2fHz < %.2fHz", label, snap["rate_hz"], warn_below)
-    if overrun_warn is not None and snap["interval_overrun"] >= overrun_warn:
-        logger.warning("%s overrun in interval: %d", label, snap["interval_overrun"])
+def log_all_stats(logger, components: dict[str, tuple]) -> None:
+    """所有组件统计合成一条多行日志，每个统计周期只走一次日志框架。
+
+    components: 标签 -> (stats, warn_below, overrun_warn)
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    lines = []
+    for label, (stats, warn_below, overrun_warn) in components.items():
+        snap = stats.snapshot()
+        lines.append(
+            f"{label} rate={snap['rate_hz']:.2f}Hz total={snap['total']} "
+            f"dropped={snap['dropped']} overrun={snap['overrun']}"
+        )
+        if warn_below is not None and 0 < snap["rate_hz"] < warn_below:
+            logger.warning("%s rate below target: %.2fHz < %.2fHz", label, snap["rate_hz"], warn_below)
+        if overrun_warn is not None and snap["interval_overrun"] >= overrun_warn:
+            logger.warning("%s overrun in interval: %d", label, snap["interval_overrun"])
+    logger.info("%s", "\n".join(lines))
 
 
 def main() -> int:
@@ -84,41 +99,34 @@ def main() -> int:
     telemetry.start()
     observation.start()
 
+    stats_components = {
+        "video": (camera.stats, float(camera_cfg.get("fps_warn_below", 0)) or None, None),
+        "audio": (audio.stats, None, int(audio_cfg.get("overrun_warn", 0)) or None),
+        "telemetry": (telemetry.stats, None, None),
+        "observation": (observation.stats, None, None),
+    }
+
     start = time.monotonic()
     next_stats = start + stats_interval
 
+    # SIGINT 置位 Event，主循环 wait() 立即醒来收尾，
+    # 不再靠固定步长 sleep 轮询（最坏多等一个 sleep 周期）
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
     try:
         if duration_sec <= 0:
             logger.info("Running until interrupted...")
-            while True:
-                time.sleep(1)
-                if time.monotonic() >= next_stats:
-                    log_stats(logger, "video", camera.stats, warn_below=float(camera_cfg.get("fps_warn_below", 0)) or None)
-                    log_stats(
-                        logger,
-                        "audio",
-                        audio.stats,
-                        overrun_warn=int(audio_cfg.get("overrun_warn", 0)) or None,
-                    )
-                    log_stats(logger, "telemetry", telemetry.stats)
-                    log_stats(logger, "observation", observation.stats)
-                    next_stats = time.monotonic() + stats_interval
-        else:
-            while time.monotonic() - start < duration_sec:
-                time.sleep(0.2)
-                if time.monotonic() >= next_stats:
-                    log_stats(logger, "video", camera.stats, warn_below=float(camera_cfg.get("fps_warn_below", 0)) or None)
-                    log_stats(
-                        logger,
-                        "audio",
-                        audio.stats,
-                        overrun_warn=int(audio_cfg.get("overrun_warn", 0)) or None,
-                    )
-                    log_stats(logger, "telemetry", telemetry.stats)
-                    log_stats(logger, "observation", observation.stats)
-                    next_stats += stats_interval
-    except KeyboardInterrupt:
-        logger.info("Interrupted by user")
+        while not stop.is_set():
+            if duration_sec > 0 and time.monotonic() - start >= duration_sec:
+                break
+            # 一次睡到下一个统计时刻（上限 1s，保证时长检查及时）
+            stop.wait(max(0.05, min(next_stats - time.monotonic(), 1.0)))
+            if time.monotonic() >= next_stats:
+                log_all_stats(logger, stats_components)
+                next_stats += stats_interval
+        if stop.is_set():
+            logger.info("Interrupted by user")
     finally:
         camera.stop()
         audio.stop()
@@ -1,54 +1,56 @@
 from __future__ import annotations
 
-import threading
 import time
 
 
 class StatsCounter:
+    """采集线程侧的无锁计数器。
+
+    每个计数器只有一个写线程，普通 int 自增在 GIL 下对读侧可见，
+    不需要每个样本拿一次锁。snapshot() 由读侧记住上次的累计值、
+    用差值得到区间统计，不回写清零，因此读写之间没有竞态窗口。
+    """
+
     def __init__(self) -> None:
-        self._lock = threading.Lock()
         self._start = time.monotonic()
         self._interval_start = self._start
         self.total = 0
         self.dropped = 0
         self.overrun = 0
-        self._interval_total = 0
-        self._interval_dropped = 0
-        self._interval_overrun = 0
+        self._last_total = 0
+        self._last_dropped = 0
+        self._last_overrun = 0
 
     def increment(self, count: int = 1) -> None:
-        with self._lock:
-            self.total += count
-            self._interval_total += count
+        self.total += count
 
     def drop(self, count: int = 1) -> None:
-        with self._lock:
-            self.dropped += count
-            self._interval_dropped += count
+        self.dropped += count
 
     def add_overrun(self, count: int = 1) -> None:
-        with self._lock:
-            self.overrun += count
-            self._interval_overrun += count
+        self.overrun += count
 
     def snapshot(self, reset_interval: bool = True) -> dict:
         now = time.monotonic()
-        with self._lock:
-            interval = now - self._interval_start
-            fps = self._interval_total / interval if interval > 0 else 0.0
-            snapshot = {
-                "total": self.total,
-                "dropped": self.dropped,
-                "overrun": self.overrun,
-                "interval_sec": interval,
-                "interval_count": self._interval_total,
-                "interval_dropped": self._interval_dropped,
-                "interval_overrun": self._interval_overrun,
-                "rate_hz": fps,
-            }
-            if reset_interval:
-                self._interval_start = now
-                self._interval_total = 0
-                self._interval_dropped = 0
-                self._interval_overrun = 0
+        total = self.total
+        dropped = self.dropped
+        overrun = self.overrun
+        interval = now - self._interval_start
+        interval_total = total - self._last_total
+        fps = interval_total / interval if interval > 0 else 0.0
+        snapshot = {
+            "total": total,
+            "dropped": dropped,
+            "overrun": overrun,
+            "interval_sec": interval,
+            "interval_count": interval_total,
+            "interval_dropped": dropped - self._last_dropped,
+            "interval_overrun": overrun - self._last_overrun,
+            "rate_hz": fps,
+        }
+        if reset_interval:
+            self._interval_start = now
+            self._last_total = total
+            self._last_dropped = dropped
+            self._last_overrun = overrun
         return snapshot
@@ -6,10 +6,39 @@ import math
 import sys
 import time
 import wave
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 
+try:
+    from scipy import fft as _scipy_fft
+except ImportError:  # 可选加速：无 scipy 时回退 numpy.fft
+    _scipy_fft = None
+
+# scipy.fft 原生跑 float32 内核（numpy.fft 内部升为 float64，带宽和
+# 计算都翻倍）；离线批处理 workers=-1 吃满多核
+if _scipy_fft is not None:
+
+    def _rfft(x: np.ndarray, n: int) -> np.ndarray:
+        return _scipy_fft.rfft(x, n=n, workers=-1)
+
+    def _irfft(X: np.ndarray, n: int) -> np.ndarray:
+        return _scipy_fft.irfft(X, n=n, workers=-1)
+
+else:
+
+    # numpy.fft 一律产出 complex128/float64；float32 输入时压回单精度，
+    # 后面 conj/abs/乘除的带宽减半、SIMD 通道数翻倍
+    def _rfft(x: np.ndarray, n: int) -> np.ndarray:
+        out = np.fft.rfft(x, n=n)
+        return out.astype(np.complex64) if x.dtype == np.float32 else out
+
+    def _irfft(X: np.ndarray, n: int) -> np.ndarray:
+        out = np.fft.irfft(X, n=n)
+        return out.astype(np.float32) if X.dtype == np.complex64 else out
+
+
 def _add_repo_to_path() -> Path:
     repo_root = Path(__file__).resolve().parents[2]
     if str(repo_root) not in sys.path:
@@ -20,26 +49,30 @@ def _add_repo_to_path() -> Path:
 repo_root = _add_repo_to_path()
 
 from apps.acquisition.config_utils import load_config  # noqa: E402
+from apps.acquisition.jsonl_io import IndexBatcher, dumps as jsonl_dumps  # noqa: E402
 from src.common.timebase import TimeBase  # noqa: E402
 
 
 def read_wav(path: Path) -> tuple[np.ndarray, int]:
+    """读 WAV，返回 (channels, samples) 通道优先的 int16 数组。
+
+    WAV 是按帧交错的；入口转置一次，后面每个通道就是连续内存，
+    FFT 前处理不再走跨通道步长的切片。保留 int16 不升 float32：
+    长录音常驻内存减半以上，归一化推迟到逐块加窗时顺带完成。
+    """
     with wave.open(str(path), "rb") as wav:
         channels = wav.getnchannels()
         sample_rate = wav.getframerate()
         frames = wav.getnframes()
         data = wav.readframes(frames)
-        samples = np.frombuffer(data, dtype=np.int16)
-        if channels > 1:
-            samples = samples.reshape(-1, channels)
-        else:
-            samples = samples.reshape(-1, 1)
-    return samples.astype(np.float32) / 32768.0, sample_rate
+        samples = np.frombuffer(data, dtype=np.int16).reshape(-1, max(channels, 1))
+    return np.ascontiguousarray(samples.T), sample_rate
 
 
 def write_wav(path: Path, data: np.ndarray, sample_rate: int) -> None:
-    channels = data.shape[1]
-    audio_i16 = np.clip(data * 32767.0, -32768, 32767).astype(np.int16)
+    """写 WAV；data 为 (channels, samples) 通道优先布局"""
+    channels = data.shape[0]
+    audio_i16 = np.clip(data.T * 32767.0, -32768, 32767).astype(np.int16)
     with wave.open(str(path), "wb") as wav:
         wav.setnchannels(channels)
         wav.setsampwidth(2)
@@ -48,33 +81,101 @@ def write_wav(path: Path, data: np.ndarray, sample_rate: int) -> None:
 
 
 def gcc_phat(sig: np.ndarray, refsig: np.ndarray, fs: int, max_tau: float | None = None) -> tuple[float, float]:
-    n = sig.shape[0] + refsig.shape[0]
-    SIG = np.fft.rfft(sig, n=n)
-    REFSIG = np.fft.rfft(refsig, n=n)
-    R = SIG * np.conj(REFSIG)
+    # 补零到 2 的幂：pocketfft 的 radix-2 路径比混合基快得多，
+    # 额外零填充对互相关无影响（只是加宽可搜索窗口）
+    n = 1 << (sig.shape[0] + refsig.shape[0] - 1).bit_length()
+    spec = _rfft(np.stack([sig, refsig]), n)
+    # conj 直接写进结果缓冲再原地相乘，互功率谱一步不留临时数组
+    R = np.conjugate(spec[1:2])
+    R *= spec[0:1]
+    # PHAT 白化用倒数原地乘：复数除法内核换成复数*实数乘，
+    # denom 缓冲从取模到倒数一路复用
     denom = np.abs(R)
-    R = R / (denom + 1e-12)
-    cc = np.fft.irfft(R, n=n)
+    denom += 1e-12
+    np.reciprocal(denom, out=denom)
+    R *= denom
+    cc = _irfft(R, n)[0]
 
     max_shift = n // 2
     if max_tau is not None:
         max_shift = min(int(fs * max_tau), max_shift)
+    return _peak_from_cc(cc, fs, max_shift)
+
+
+def _peak_from_cc(cc: np.ndarray, fs: int, max_shift: int) -> tuple[float, float]:
+    """从一行互相关里取峰值时延和峰均比
+
+    负/非负时延分别在尾部和头部切片上找峰，不再 concatenate 出一个
+    2*max_shift+1 的新数组；取模原地写回 cc（该行之后不再使用）。
+    """
+    acc = np.abs(cc, out=cc)
+    tail = acc[-max_shift:]
+    head = acc[: max_shift + 1]
+    i_tail = int(tail.argmax())
+    i_head = int(head.argmax())
+    if tail[i_tail] >= head[i_head]:  # 平手取尾部，与 concatenate 版一致
+        shift = i_tail - max_shift
+        peak = float(tail[i_tail])
+    else:
+        shift = i_head
+        peak = float(head[i_head])
+    mean = float(tail.sum() + head.sum()) / (tail.shape[0] + head.shape[0]) + 1e-12
+    return shift / float(fs), peak / mean
+
+
+@lru_cache(maxsize=8)
+def _lag_basis(n: int, max_shift: int) -> np.ndarray:
+    """±max_shift 滞后窗对应的 DFT 求值矩阵（含实信号半谱的重建权重）。
+
+    峰值搜索只看 2*max_shift+1 个滞后点（5cm 阵距下只有几个样本），
+    没必要做整条 O(n log n) 的 irfft；窄窗直接按定义求值是
+    O(max_shift * n/2)，且矩阵按 (n, max_shift) 缓存。
+    """
+    lags = np.arange(-max_shift, max_shift + 1)
+    bins = np.arange(n // 2 + 1)
+    basis = np.exp((2j * np.pi / n) * np.outer(lags, bins))
+    basis[:, 0] *= 0.5
+    basis[:, -1] *= 0.5
+    return basis * (2.0 / n)
 
-    cc = np.concatenate((cc[-max_shift:], cc[: max_shift + 1]))
-    shift = np.argmax(np.abs(cc)) - max_shift
-    tau = shift / float(fs)
-    peak = float(np.max(np.abs(cc)))
-    mean = float(np.mean(np.abs(cc))) + 1e-12
-    ratio = peak / mean
-    return tau, ratio
+
+# 滞后窗大到一定程度后矩阵求值反而比 irfft 贵（也撑大缓存），回退批量逆变换
+_MAX_DIRECT_SHIFT = 64
+
+
+def _peak_from_lags(cc_win: np.ndarray, fs: int, max_shift: int) -> tuple[float, float]:
+    """窄窗互相关上取峰：抛物线内插给出亚采样时延"""
+    acc = np.abs(cc_win)
+    i = int(acc.argmax())
+    shift = float(i - max_shift)
+    if 0 < i < acc.shape[0] - 1:
+        denom = acc[i - 1] - 2.0 * acc[i] + acc[i + 1]
+        if denom < 0:  # 真峰（二阶差分为负）才内插
+            shift += 0.5 * (acc[i - 1] - acc[i + 1]) / denom
+    peak = float(acc[i])
+    mean = float(acc.mean()) + 1e-12
+    return shift / float(fs), peak / mean
+
+
+@lru_cache(maxsize=8)
+def _hann(n: int) -> np.ndarray:
+    # 块长固定，余弦表按长度缓存一次；不然每块重算 O(N) 个三角函数
+    return np.hanning(n).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def _hann_i16(n: int) -> np.ndarray:
+    # int16 输入专用：1/32768 归一化折进窗表，加窗即完成转 float
+    return _hann(n) * np.float32(1.0 / 32768.0)
 
 
 def _pre_emphasis(sig: np.ndarray, coeff: float) -> np.ndarray:
+    # copy + 原地 -=：只剩 coeff*sig[:-1] 一个临时数组，
+    # 比 empty_like 加两段切片赋值少一次 O(N) 分配拷贝
     if coeff <= 0:
         return sig
-    out = np.empty_like(sig)
-    out[0] = sig[0]
-    out[1:] = sig[1:] - coeff * sig[:-1]
+    out = sig.copy()
+    out[..., 1:] -= coeff * sig[..., :-1]
     return out
 
 
@@ -87,51 +188,70 @@ def estimate_bearing(
     window: str,
     pre_emphasis: float,
 ) -> tuple[float | None, float]:
-    if sig.shape[1] < 2:
+    """sig 为 (channels, samples) 通道优先布局（read_wav 的输出）"""
+    num_ch = sig.shape[0]
+    if num_ch < 2:
         return None, 0.0
 
+    is_i16 = sig.dtype == np.int16
+
+    # 通道已是连续行，窗/预加重整批做；单次 2-D rfft 让 pocketfft
+    # 按 batch 复用 twiddle 表和缓存，不再每通道一次变换。int16 输入
+    # 乘带归一化的窗表，升 float32 与加窗一次完成
     if window == "hann":
-        win = np.hanning(sig.shape[0]).astype(np.float32)
+        win = _hann_i16(sig.shape[1]) if is_i16 else _hann(sig.shape[1])
+        prepped = sig * win
+    elif is_i16:
+        prepped = sig.astype(np.float32)
+        prepped *= np.float32(1.0 / 32768.0)
     else:
-        win = None
-
-    def prep(channel: np.ndarray) -> np.ndarray:
-        out = channel
-        if win is not None:
-            out = out * win
-        return _pre_emphasis(out, pre_emphasis)
+        prepped = sig
+    prepped = _pre_emphasis(prepped, pre_emphasis)
 
-    channels = [prep(sig[:, idx]) for idx in range(sig.shape[1])]
-    pairs: list[tuple[int, int]] = []
     if pair_mode == "adjacent":
-        pairs = [(idx, idx + 1) for idx in range(sig.shape[1] - 1)]
+        pairs = [(idx, idx + 1) for idx in range(num_ch - 1)]
     else:
-        pairs = [(0, idx) for idx in range(1, sig.shape[1])]
+        pairs = [(0, idx) for idx in range(1, num_ch)]
+    pairs = [(i, j) for i, j in pairs if mic_distance_m * abs(i - j) > 0]
+    if not pairs:
+        return None, 0.0
 
-    angles: list[float] = []
-    weights: list[float] = []
-    for i, j in pairs:
+    n = 1 << (2 * sig.shape[1] - 1).bit_length()
+    spec = _rfft(prepped, n)
+    R = np.empty((len(pairs), spec.shape[1]), dtype=spec.dtype)
+    for k, (i, j) in enumerate(pairs):
+        # conj 直接写进批量缓冲的行里再原地相乘，每对不产生临时数组
+        np.conjugate(spec[j], out=R[k])
+        R[k] *= spec[i]
+    # PHAT 白化用倒数原地乘：复数除法内核换成复数*实数乘，
+    # denom 缓冲从取模到倒数一路复用
+    denom = np.abs(R)
+    denom += 1e-12
+    np.reciprocal(denom, out=denom)
+    R *= denom
+
+    # 聚合走 np.dot/np.max，Python 循环只留每对一次的峰值提取
+    angles = np.empty(len(pairs), np.float32)
+    weights = np.empty(len(pairs), np.float32)
+    for k, (i, j) in enumerate(pairs):
         distance = mic_distance_m * abs(i - j)
-        if distance <= 0:
-            continue
-        tdoa, ratio = gcc_phat(channels[i], channels[j], fs, max_tau=distance / speed_sound)
+        max_shift = min(int(fs * distance / speed_sound) + 1, n // 2)
+        if max_shift <= _MAX_DIRECT_SHIFT:
+            cc_win = (_lag_basis(n, max_shift) @ R[k]).real
+            tdoa, ratio = _peak_from_lags(cc_win, fs, max_shift)
+        else:
+            tdoa, ratio = _peak_from_cc(_irfft(R[k : k + 1], n)[0], fs, max_shift)
         value = (tdoa * speed_sound) / distance
         value = float(np.clip(value, -1.0, 1.0))
-        angle_rad = math.asin(value)
-        angle = math.degrees(angle_rad)
-        conf = float(ratio / (ratio + 1.0))
-        angles.append(angle)
-        weights.append(conf)
-
-    if not angles:
-        return None, 0.0
+        angles[k] = math.degrees(math.asin(value))
+        weights[k] = ratio / (ratio + 1.0)
 
-    total = sum(weights)
+    total = float(weights.sum())
     if total <= 0:
         return None, 0.0
 
-    bearing = sum(a * w for a, w in zip(angles, weights)) / total
-    confidence = max(weights)
+    bearing = float(np.dot(angles, weights) / total)
+    confidence = float(weights.max())
     return bearing, confidence
 
 
@@ -152,17 +272,19 @@ def synth_multichannel(
     delay_samples = delay * sample_rate
 
     def shift(sig: np.ndarray, samples: float) -> np.ndarray:
+        # 下标夹取 + 乘 0/1 有效位：全长顺序 gather 取代布尔花式索引，
+        # 越界位置结果仍为 0，与掩码赋值版一致
         idx = np.arange(sig.shape[0]) - samples
         idx0 = np.floor(idx).astype(int)
         frac = idx - idx0
-        shifted = np.zeros_like(sig)
-        valid = (idx0 >= 0) & (idx0 + 1 < sig.shape[0])
-        shifted[valid] = sig[idx0[valid]] * (1 - frac[valid]) + sig[idx0[valid] + 1] * frac[valid]
-        return shifted
+        valid = ((idx0 >= 0) & (idx0 + 1 < sig.shape[0])).astype(sig.dtype)
+        idx0 = np.clip(idx0, 0, sig.shape[0] - 2)
+        return (sig[idx0] * (1 - frac) + sig[idx0 + 1] * frac) * valid
 
     ch0 = base
     ch1 = shift(base, delay_samples)
-    return np.stack([ch0, ch1], axis=1).astype(np.float32)
+    # 与 read_wav 一致的 (channels, samples) 布局
+    return np.stack([ch0, ch1], axis=0).astype(np.float32)
 
 
 def load_audio_index(index_path: Path) -> list[dict]:
@@ -230,9 +352,12 @@ def run_doa(config: dict, run_dir: Path, input_wav: Path | None) -> None:
     smoothed_angle: float | None = None
     errors: list[float] = []
     block_id = 0
-    with obs_path.open("w", encoding="utf-8") as obs_handle, metrics_path.open("a", encoding="utf-8") as metrics_handle:
-        for start in range(0, audio.shape[0] - block_samples + 1, block_samples):
-            chunk = audio[start : start + block_samples]
+    # 逐块的 JSON 编码 + write 走采集侧同一套批量 JSONL 写（orjson 可用
+    # 时用 C 序列化器，每 64 条合并成一次 write），处理循环不再每块刷盘
+    with obs_path.open("wb", buffering=64 * 1024) as obs_handle, metrics_path.open("ab") as metrics_handle:
+        obs_batcher = IndexBatcher(obs_handle)
+        for start in range(0, audio.shape[1] - block_samples + 1, block_samples):
+            chunk = audio[:, start : start + block_samples]
             time_obj = time_index[block_id] if block_id < len(time_index) else timebase.now()
             angle, conf_score = estimate_bearing(
                 chunk,
@@ -268,8 +393,9 @@ def run_doa(config: dict, run_dir: Path, input_wav: Path | None) -> None:
                 "status": status,
                 "extras": {"block_id": block_id},
             }
-            obs_handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+            obs_batcher.append(record)
             block_id += 1
+        obs_batcher.flush()
 
         if use_synth and errors:
             metrics = {
@@ -282,7 +408,7 @@ def run_doa(config: dict, run_dir: Path, input_wav: Path | None) -> None:
                     "blocks": len(errors),
                 },
             }
-            metrics_handle.write(json.dumps(metrics, ensure_ascii=True) + "\n")
+            metrics_handle.write(jsonl_dumps(metrics) + b"\n")
 
 
 def main() -> int:
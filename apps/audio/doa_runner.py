@@ -11,7 +11,6 @@ DOA (Direction of Arrival) 实时运行器。
 from __future__ import annotations
 
 import argparse
-import json
 import queue
 import sys
 import threading
@@ -29,6 +28,7 @@ def _add_repo_to_path() -> Path:
 repo_root = _add_repo_to_path()
 
 from apps.acquisition.config_utils import load_config  # noqa: E402
+from apps.acquisition.jsonl_io import IndexBatcher  # noqa: E402
 from apps.audio.doa_online import DOAConfig, OnlineDOA  # noqa: E402
 
 
@@ -74,7 +74,8 @@ def run_doa_live(config: dict, run_dir: Path, device_override: int | None) -> No
 
     def audio_callback(indata, frames, time_info, status):
         if not stop_event.is_set():
-            doa.process_chunk(indata.copy())
+            # RingBuffer.write 会立即拷贝，回调里无需再 copy 一次
+            doa.process_chunk(indata)
 
     doa.start()
 
@@ -100,15 +101,25 @@ def run_doa_live(config: dict, run_dir: Path, device_override: int | None) -> No
     stream.start()
 
     try:
-        with obs_path.open("w", encoding="utf-8") as handle:
-            while not stop_event.is_set():
-                try:
-                    result = result_queue.get(timeout=1.0)
-                    record = doa.to_observation(result)
-                    handle.write(json.dumps(record, ensure_ascii=True) + "\n")
-                    handle.flush()
-                except queue.Empty:
-                    continue
+        # 64 KiB 缓冲 + IndexBatcher：每批一次聚合写，不再每条观测
+        # 一次 write+flush 系统调用（与离线 run_doa 同一套路）
+        with obs_path.open("wb", buffering=64 * 1024) as handle:
+            batcher = IndexBatcher(handle)
+            try:
+                while not stop_event.is_set():
+                    try:
+                        result = result_queue.get(timeout=1.0)
+                    except queue.Empty:
+                        continue
+                    # 队列有积压时一次清空，进同一次聚合写
+                    while True:
+                        batcher.append(doa.to_observation(result))
+                        try:
+                            result = result_queue.get_nowait()
+                        except queue.Empty:
+                            break
+            finally:
+                batcher.flush()
     except KeyboardInterrupt:
         pass
     finally:
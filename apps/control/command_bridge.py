@@ -20,6 +20,11 @@ from apps.acquisition.config_utils import load_config  # noqa: E402
 from src.control.control_gate import CommandGate, GateConfig  # noqa: E402
 from src.control.mavlink_control import MavlinkControl  # noqa: E402
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # 无 inotify 支持时回退到轮询
+    INotify = None
+
 
 def extract_command(record: dict) -> dict | None:
     if "type" in record:
@@ -77,38 +82,54 @@ def main() -> int:
             baud = int(bridge_cfg.get("baud", 115200))
             control = MavlinkControl(port, baud=baud)
 
+    # 有 inotify 时在内核里等文件增长，新命令到达即醒且空闲期零唤醒，
+    # 不再固定 0.2s 轮询（最坏引入 200ms 命令延迟）；否则回退轮询
+    watcher = None
+    if INotify is not None:
+        try:
+            watcher = INotify()
+            watcher.add_watch(str(commands_path), inotify_flags.MODIFY)
+        except OSError:
+            watcher = None
+
     with commands_path.open("r", encoding="utf-8") as handle:
         if not start_from_beginning:
             handle.seek(0, 2)
-        while True:
-            line = handle.readline()
-            if not line:
-                time.sleep(0.2)
-                continue
-            try:
-                record = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            cmd = extract_command(record)
-            if not cmd:
-                continue
-            cmd_type = str(cmd.get("type", "")).upper()
-            params = cmd.get("params", {})
-            if not gate.can_send(cmd_type):
-                continue
-            if control is None:
-                gate.mark_sent()
-                continue
-            if cmd_type == "SET_YAW":
-                yaw_deg = float(params.get("yaw_deg", 0))
-                yaw_rate = float(params.get("yaw_rate_deg_s", default_yaw_rate))
-                control.send_yaw(yaw_deg, yaw_rate, relative=False)
-            elif cmd_type == "SET_MODE":
-                mode = str(params.get("mode", "LOITER"))
-                control.set_mode(mode)
-            elif cmd_type == "STOP":
-                control.send_stop()
-            gate.mark_sent()
+        try:
+            while True:
+                # 一次唤醒清空所有已写入的新行，不是每醒一次取一条
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    cmd = extract_command(record)
+                    if not cmd:
+                        continue
+                    cmd_type = str(cmd.get("type", "")).upper()
+                    params = cmd.get("params", {})
+                    if not gate.can_send(cmd_type):
+                        continue
+                    if control is None:
+                        gate.mark_sent()
+                        continue
+                    if cmd_type == "SET_YAW":
+                        yaw_deg = float(params.get("yaw_deg", 0))
+                        yaw_rate = float(params.get("yaw_rate_deg_s", default_yaw_rate))
+                        control.send_yaw(yaw_deg, yaw_rate, relative=False)
+                    elif cmd_type == "SET_MODE":
+                        mode = str(params.get("mode", "LOITER"))
+                        control.set_mode(mode)
+                    elif cmd_type == "STOP":
+                        control.send_stop()
+                    gate.mark_sent()
+                if watcher is not None:
+                    watcher.read(timeout=1000)
+                else:
+                    time.sleep(0.2)
+        finally:
+            if watcher is not None:
+                watcher.close()
 
     return 0
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 import time
+from itertools import chain
 from pathlib import Path
 
 def _add_repo_to_path() -> Path:
@@ -16,6 +16,7 @@ def _add_repo_to_path() -> Path:
 repo_root = _add_repo_to_path()
 
 from apps.acquisition.config_utils import load_config  # noqa: E402
+from apps.acquisition.jsonl_io import dumps, loads  # noqa: E402
 from src.control.control_gate import CommandGate, GateConfig  # noqa: E402
 from src.control.mavlink_control import MavlinkControl  # noqa: E402
 from src.common.timebase import TimeBase  # noqa: E402
@@ -36,20 +37,19 @@ def get_mono_ms(record: dict) -> int:
     return 0
 
 
-def load_jsonl(path: Path) -> list[dict]:
+def iter_jsonl(path: Path):
+    """逐行流式解析 JSONL；回放是严格顺序的，不必整文件物化成 list"""
     if not path.exists():
-        return []
-    records = []
-    with path.open("r", encoding="utf-8") as handle:
+        return
+    with path.open("rb") as handle:
         for line in handle:
             line = line.strip()
             if not line:
                 continue
             try:
-                records.append(json.loads(line))
-            except json.JSONDecodeError:
+                yield loads(line)
+            except ValueError:
                 continue
-    return records
 
 
 class SensorHealth:
@@ -84,16 +84,43 @@ class SensorHealth:
 
 
 class TelemetryMonitor:
+    """增量跟读 telemetry.jsonl，只取最新的 link_status。
+
+    每步整文件重读是 O(M) 的 I/O+解析（回放 N 条观测就是 O(N·M)）；
+    记住文件偏移后每步只读只解析新增的行。
+    """
+
     def __init__(self, telemetry_path: Path) -> None:
         self.telemetry_path = telemetry_path
         self._last_status = "OK"
+        self._handle = None
+        self._offset = 0
 
     def update(self) -> str:
-        records = load_jsonl(self.telemetry_path)
-        if not records:
+        if self._handle is None:
+            # 文件可能尚未创建（采集端后启动），首次出现时再打开
+            try:
+                self._handle = self.telemetry_path.open("rb")
+            except OSError:
+                return self._last_status
+        self._handle.seek(self._offset)
+        data = self._handle.read()
+        end = data.rfind(b"\n")
+        if end < 0:
+            # 没有新的完整行；半行留在偏移之后等写端补完
             return self._last_status
-        latest = records[-1]
-        self._last_status = str(latest.get("link_status", "OK"))
+        self._offset += end + 1
+        # 从后往前找第一条能解析的非空行即可，旧的状态都被它覆盖
+        for raw in reversed(data[:end].split(b"\n")):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                record = loads(raw)
+            except ValueError:
+                continue
+            self._last_status = str(record.get("link_status", "OK"))
+            break
         return self._last_status
 
 
@@ -158,8 +185,9 @@ class FSM:
             "severity": "INFO",
             "note": note,
         }
-        with self._events_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+        # 二进制追加 + jsonl_io.dumps：省掉 stdlib 逐字符转义和 encode 往返
+        with self._events_path.open("ab") as handle:
+            handle.write(dumps(record) + b"\n")
         self._last_event[event_type] = now
 
     def _log_command(self, cmd_type: str, params: dict, allowed: bool, note: str) -> None:
@@ -171,8 +199,8 @@ class FSM:
             "allowed": allowed,
             "note": note,
         }
-        with self._commands_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+        with self._commands_path.open("ab") as handle:
+            handle.write(dumps(record) + b"\n")
 
     def _send_yaw(self, bearing: float) -> None:
         allowed = self._gate.can_send("SET_YAW")
@@ -396,19 +424,23 @@ def main() -> int:
     monitor = TelemetryMonitor(telemetry_path)
     fsm = FSM(config, gate, control, events_path, commands_path)
 
-    events = load_jsonl(obs_path)
-    if not events:
+    # 流式回放：长录像不整文件物化，峰值内存 O(1) 且无冷启动停顿。
+    # 先窥首条记录拿基准时间戳，再接回生成器
+    events = iter_jsonl(obs_path)
+    first = next(events, None)
+    if first is None:
         return 0
 
-    start_mono = get_mono_ms(events[0])
+    start_mono = get_mono_ms(first)
+    scale = 1.0 / (1000.0 * args.speed) if args.speed > 0 else 0.0
     start_time = time.perf_counter()
-    for record in events:
+    for record in chain([first], events):
         gate.update_link_status(monitor.update())
-        t_mono = get_mono_ms(record) or start_mono
         if args.speed > 0:
-            target_elapsed = (t_mono - start_mono) / 1000.0 / args.speed
-            while time.perf_counter() - start_time < target_elapsed:
-                time.sleep(0.001)
+            # 到点一次 sleep 睡到位，不再每 1ms 唤醒轮询
+            dt = ((get_mono_ms(record) or start_mono) - start_mono) * scale - (time.perf_counter() - start_time)
+            if dt > 0:
+                time.sleep(dt)
         fsm.step(record)
 
     return 0
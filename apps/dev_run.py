@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 import time
 import uuid
 from datetime import datetime, timezone
@@ -10,6 +11,18 @@ from pathlib import Path
 import yaml
 
 
+def _add_repo_to_path() -> Path:
+    repo_root = Path(__file__).resolve().parents[1]
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    return repo_root
+
+
+_add_repo_to_path()
+
+from apps.acquisition.jsonl_io import dumps  # noqa: E402
+
+
 def load_config(path: Path) -> dict:
     with path.open("r", encoding="utf-8") as handle:
         data = yaml.safe_load(handle)
@@ -95,7 +108,8 @@ def write_mock_telemetry(path: Path, duration_sec: float, interval_sec: float) -
     start = time.time()
     next_tick = start
     seq = 0
-    with path.open("w", encoding="utf-8") as handle:
+    # 二进制写 + jsonl_io.dumps（有 orjson 时走 C 编码器）
+    with path.open("wb") as handle:
         while time.time() - start < duration_sec:
             payload = {
                 "seq": seq,
@@ -109,7 +123,7 @@ def write_mock_telemetry(path: Path, duration_sec: float, interval_sec: float) -
                 "heading_deg": (seq * 3) % 360,
             }
             record = envelope("telemetry", "mock", payload)
-            handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+            handle.write(dumps(record) + b"\n")
             seq += 1
             next_tick += interval_sec
             time.sleep(max(0.0, next_tick - time.time()))
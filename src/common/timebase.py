@@ -5,7 +5,15 @@ import time
 
 class TimeBase:
     def now(self) -> dict:
+        mono_ms, epoch_ms = self.now_ms()
         return {
-            "mono_ms": int(time.monotonic() * 1000),
-            "epoch_ms": int(time.time() * 1000),
+            "mono_ms": mono_ms,
+            "epoch_ms": epoch_ms,
         }
+
+    def now_ms(self) -> tuple[int, int]:
+        """Return (mono_ms, epoch_ms) as plain ints without building a dict.
+
+        Uses the _ns clocks so the conversion stays in integer arithmetic.
+        """
+        return time.monotonic_ns() // 1_000_000, time.time_ns() // 1_000_000
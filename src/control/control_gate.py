@@ -14,6 +14,8 @@ class GateConfig:
 class CommandGate:
     def __init__(self, config: GateConfig) -> None:
         self._config = config
+        # 每条命令都要查一次放行名单，固化成 frozenset 换 O(1) 成员判断
+        self._allow_types = frozenset(config.allow_types)
         self._last_send = 0.0
         self._last_cmd = 0.0
         self._link_status = "OK"
@@ -22,7 +24,7 @@ class CommandGate:
         self._link_status = status
 
     def can_send(self, cmd_type: str) -> bool:
-        if cmd_type not in self._config.allow_types:
+        if cmd_type not in self._allow_types:
             return False
         if self._link_status != "OK":
             return False